@@ -0,0 +1,72 @@
+"""
+SVG Cache for TJ_Vector nodes
+Shares parsed SVG trees and node results between chained nodes.
+
+A node that produces an SVG string registers the tree it serialized with
+remember_svg(); the next node in the chain gets a copy of that tree from
+parse_svg() instead of parsing the string again (deepcopy is much cheaper
+than parsing). Node results can be memoized with cached_result()/store_result()
+so re-running a node with unchanged inputs is a dict lookup.
+"""
+
+import copy
+from collections import OrderedDict
+from xml.etree import ElementTree as ET
+
+
+MAX_ENTRIES = 8
+
+SVG_NS = "{http://www.w3.org/2000/svg}"
+# Element names accepted as tag selectors by the editing nodes
+SVG_TAGS = frozenset(("g", "path", "rect", "circle", "ellipse", "line", "polyline", "polygon", "text"))
+
+_trees = OrderedDict()
+_results = OrderedDict()
+
+
+def _lru_get(cache, key):
+    value = cache.get(key)
+    if value is not None:
+        cache.move_to_end(key)
+    return value
+
+
+def _lru_put(cache, key, value):
+    cache[key] = value
+    cache.move_to_end(key)
+    while len(cache) > MAX_ENTRIES:
+        cache.popitem(last=False)
+
+
+def parse_svg(svg_string):
+    """
+    Return a parsed SVG root the caller may modify freely.
+    Raises the same errors as ET.fromstring.
+    """
+    root = _lru_get(_trees, svg_string)
+    if root is None:
+        return ET.fromstring(svg_string)
+    return copy.deepcopy(root)
+
+
+def remember_svg(svg_string, root):
+    """
+    Register root as the parsed form of svg_string.
+    The caller must not modify root afterwards.
+    """
+    _lru_put(_trees, svg_string, root)
+
+
+def cached_result(key):
+    """
+    Previously stored node result for key, or None
+    """
+    return _lru_get(_results, key)
+
+
+def store_result(key, result):
+    """
+    Memoize a node result (tuple of immutable values) under key
+    """
+    _lru_put(_results, key, result)
+    return result
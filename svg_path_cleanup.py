@@ -8,6 +8,177 @@ import json
 import numpy as np
 from xml.etree import ElementTree as ET
 
+from .svg_cache import SVG_NS, parse_svg, remember_svg, cached_result, store_result
+
+try:
+    from numba import config as numba_config, njit, prange
+except ImportError:
+    njit = None
+
+
+# Numbers in path data, including exponents such as 1e-3
+_NUM_RE = re.compile(r'[-+]?[0-9]*\.?[0-9]+(?:[eE][-+]?[0-9]+)?')
+
+
+if njit is not None:
+    @njit(parallel=numba_config.NUMBA_NUM_THREADS > 1, cache=True)
+    def _dp_keep_mask_numba(xs, ys, offsets, tol2, keep):
+        """
+        Douglas-Peucker over every path of a flat buffer, one path per thread.
+        Marks the retained points in keep; paths with < 3 points are kept whole.
+        """
+        for p in prange(offsets.size - 1):
+            start = offsets[p]
+            end = offsets[p + 1]
+            if end - start < 3:
+                keep[start:end] = True
+                continue
+            keep[start] = True
+            keep[end - 1] = True
+            
+            stack = np.empty((end - start, 2), dtype=np.int64)
+            stack[0, 0] = start
+            stack[0, 1] = end - 1
+            top = 1
+            while top > 0:
+                top -= 1
+                lo = stack[top, 0]
+                hi = stack[top, 1]
+                ax = xs[lo]
+                ay = ys[lo]
+                dx = xs[hi] - ax
+                dy = ys[hi] - ay
+                seg2 = dx * dx + dy * dy
+                
+                # Farthest interior point (squared distance to the segment)
+                max_d2 = -1.0
+                max_idx = -1
+                for i in range(lo + 1, hi):
+                    px = xs[i] - ax
+                    py = ys[i] - ay
+                    if seg2 > 0.0:
+                        t = min(max((px * dx + py * dy) / seg2, 0.0), 1.0)
+                        px -= t * dx
+                        py -= t * dy
+                    d2 = px * px + py * py
+                    if d2 > max_d2:
+                        max_d2 = d2
+                        max_idx = i
+                
+                if max_d2 > tol2:
+                    keep[max_idx] = True
+                    stack[top, 0] = lo
+                    stack[top, 1] = max_idx
+                    stack[top + 1, 0] = max_idx
+                    stack[top + 1, 1] = hi
+                    top += 2
+
+
+def _dp_numpy(points, tolerance, out=None):
+    """
+    Iterative Douglas-Peucker on a (k, 2) array. Distances from all interior
+    points of a segment are computed in one vectorized step per stack entry.
+    Returns a boolean mask of the kept points, written into out if given.
+    """
+    n = len(points)
+    keep = np.zeros(n, dtype=bool) if out is None else out
+    if n < 3:
+        keep[:] = True
+        return keep
+    
+    keep[:] = False
+    keep[0] = keep[-1] = True
+    tol2 = tolerance * tolerance
+    stack = [(0, n - 1)]
+    
+    while stack:
+        lo, hi = stack.pop()
+        if hi - lo < 2:
+            continue
+        
+        # Squared distance from each interior point to the segment lo-hi
+        seg = points[hi] - points[lo]
+        rel = points[lo + 1:hi] - points[lo]
+        seg2 = seg @ seg
+        if seg2 > 0:
+            t = np.clip(rel @ seg / seg2, 0.0, 1.0)
+            rel = rel - t[:, None] * seg
+        d2 = np.einsum('ij,ij->i', rel, rel)
+        
+        k = int(d2.argmax())
+        if d2[k] > tol2:
+            k += lo + 1
+            keep[k] = True
+            stack.append((lo, k))
+            stack.append((k, hi))
+    
+    return keep
+
+
+class PathBuffer:
+    """
+    Flat structure-of-arrays storage for a list of polylines.
+
+    Path i owns the coordinates xs[offsets[i]:offsets[i + 1]] and
+    ys[offsets[i]:offsets[i + 1]]. ``ds`` keeps the original 'd' string of a
+    path until a stage modifies its points (None = regenerate from points).
+    """
+
+    def __init__(self, xs, ys, offsets, strokes, ds):
+        self.xs = xs
+        self.ys = ys
+        self.offsets = offsets
+        self.strokes = strokes
+        self.ds = ds
+
+    @classmethod
+    def from_points(cls, points_list, strokes, ds=None):
+        """
+        Build a buffer from a list of (k, 2) point arrays
+        """
+        offsets = np.zeros(len(points_list) + 1, dtype=np.int64)
+        if points_list:
+            np.cumsum([len(points) for points in points_list], out=offsets[1:])
+        xs = np.empty(offsets[-1], dtype=np.float64)
+        ys = np.empty(offsets[-1], dtype=np.float64)
+        for i, points in enumerate(points_list):
+            if len(points) > 0:
+                xs[offsets[i]:offsets[i + 1]] = points[:, 0]
+                ys[offsets[i]:offsets[i + 1]] = points[:, 1]
+        if ds is None:
+            ds = [None] * len(points_list)
+        return cls(xs, ys, offsets, list(strokes), list(ds))
+
+    def __len__(self):
+        return len(self.strokes)
+
+    def counts(self):
+        """
+        Number of points in each path
+        """
+        return np.diff(self.offsets)
+
+    def points(self, i):
+        """
+        (k, 2) array with the points of path i
+        """
+        start, end = self.offsets[i], self.offsets[i + 1]
+        return np.column_stack((self.xs[start:end], self.ys[start:end]))
+
+    def take(self, indices):
+        """
+        New buffer containing only the given paths, in the given order
+        """
+        indices = np.asarray(indices, dtype=np.int64)
+        counts = self.counts()[indices]
+        starts = self.offsets[:-1][indices]
+        offsets = np.zeros(len(indices) + 1, dtype=np.int64)
+        np.cumsum(counts, out=offsets[1:])
+        src = np.repeat(starts - offsets[:-1], counts) + np.arange(offsets[-1])
+        return PathBuffer(self.xs[src], self.ys[src], offsets,
+                          [self.strokes[i] for i in indices],
+                          [self.ds[i] for i in indices])
+
 
 class SVGPathCleanup:
     """
@@ -78,29 +249,34 @@ class SVGPathCleanup:
         """
         Clean up SVG by removing short paths, merging close paths, and simplifying
         """
+        cache_key = ("SVGPathCleanup", svg_string, remove_short_paths, min_path_length,
+                     merge_close_paths, merge_distance, simplify_paths, simplify_tolerance,
+                     remove_near_duplicate_paths, near_duplicate_distance, round_coordinates,
+                     decimal_places, remove_duplicate_paths)
+        cached = cached_result(cache_key)
+        if cached is not None:
+            return cached
+        
         try:
             # Parse SVG
-            root = ET.fromstring(svg_string)
+            root = parse_svg(svg_string)
             
             # Find all path elements
-            namespace = {'svg': 'http://www.w3.org/2000/svg'}
-            paths = root.findall('.//svg:path', namespace)
-            if not paths:
-                paths = root.findall('.//path')
+            paths = list(root.iter(SVG_NS + 'path')) or list(root.iter('path'))
             
             original_count = len(paths)
             
-            # Extract path data
-            path_data_list = []
+            # Extract path data into a flat buffer
+            points_list = []
+            strokes = []
+            ds = []
             for path in paths:
                 d = path.get('d', '')
                 if d:
-                    path_data_list.append({
-                        'element': path,
-                        'd': d,
-                        'stroke': path.get('stroke', '#000000'),
-                        'points': self._parse_path_d(d)
-                    })
+                    points_list.append(self._parse_path_d(d))
+                    strokes.append(path.get('stroke', '#000000'))
+                    ds.append(d)
+            path_data_list = PathBuffer.from_points(points_list, strokes, ds)
             
             exact_before = len(path_data_list)
             # Step 1: Remove exact duplicate paths
@@ -132,7 +308,7 @@ class SVGPathCleanup:
                 path_data_list = self._round_coordinates(path_data_list, decimal_places)
             
             # Remove all old paths
-            g_element = root.find('.//svg:g[@id="centerlines"]', namespace)
+            g_element = root.find(f'.//{SVG_NS}g[@id="centerlines"]')
             if g_element is None:
                 g_element = root.find('.//g[@id="centerlines"]')
             
@@ -142,22 +318,25 @@ class SVGPathCleanup:
                     g_element.remove(path)
                 
                 # Add cleaned paths
-                for i, path_data in enumerate(path_data_list):
+                xs, ys, offsets = path_data_list.xs, path_data_list.ys, path_data_list.offsets
+                for i in range(len(path_data_list)):
+                    d = path_data_list.ds[i]
+                    if d is None:
+                        start, end = offsets[i], offsets[i + 1]
+                        d = self._points_to_path_d(xs[start:end], ys[start:end])
                     new_path = ET.SubElement(g_element, 'path')
                     new_path.set('id', f'path{i}')
-                    new_path.set('d', path_data['d'])
-                    new_path.set('stroke', path_data['stroke'])
+                    new_path.set('d', d)
+                    new_path.set('stroke', path_data_list.strokes[i])
                     new_path.set('stroke-width', '2')
                     new_path.set('fill', 'none')
                     new_path.set('stroke-linecap', 'round')
                     new_path.set('stroke-linejoin', 'round')
             
-            # Convert back to string
+            # Pretty print, then convert back to string in a single pass
+            self._pretty_print_svg(root)
             cleaned_svg = ET.tostring(root, encoding='unicode')
             
-            # Pretty print
-            cleaned_svg = self._pretty_print_svg(cleaned_svg)
-            
             # Generate statistics
             stats = {
                 "original_path_count": original_count,
@@ -179,7 +358,9 @@ class SVGPathCleanup:
             
             stats_str = json.dumps(stats, indent=2)
             
-            return (cleaned_svg, stats_str)
+            # Let the next node in the chain reuse the tree instead of re-parsing
+            remember_svg(cleaned_svg, root)
+            return store_result(cache_key, (cleaned_svg, stats_str))
         
         except Exception as e:
             print(f"Error cleaning up SVG: {e}")
@@ -189,18 +370,14 @@ class SVGPathCleanup:
         """
         Parse SVG path d attribute to extract points
         """
-        points = []
-        
         # Extract all numbers
-        numbers = re.findall(r'[-+]?[0-9]*\.?[0-9]+', d)
+        numbers = _NUM_RE.findall(d)
         
-        # Convert to float and group into coordinates
-        for i in range(0, len(numbers) - 1, 2):
-            x = float(numbers[i])
-            y = float(numbers[i + 1])
-            points.append([x, y])
-        
-        return np.array(points) if points else np.array([])
+        # Convert to float in one NumPy call and group into coordinates
+        count = len(numbers) // 2 * 2
+        if count == 0:
+            return np.empty((0, 2))
+        return np.array(numbers[:count], dtype=np.float64).reshape(-1, 2)
     
     def _calculate_path_length(self, points):
         """
@@ -213,24 +390,55 @@ class SVGPathCleanup:
         lengths = np.sqrt(np.sum(diffs**2, axis=1))
         return np.sum(lengths)
     
+    def _path_hashes(self, path_data_list):
+        """
+        64-bit content hash of every path, computed in one vectorized pass.
+
+        Each coordinate pair is mixed FNV-style, weighted by a per-position
+        power of the FNV prime and summed per path (wrapping uint64 math).
+        """
+        counts = path_data_list.counts()
+        xs, ys, offsets = path_data_list.xs, path_data_list.ys, path_data_list.offsets
+        if xs.size == 0:
+            return np.zeros(len(counts), dtype=np.uint64)
+        
+        prime = np.uint64(1099511628211)
+        basis = np.uint64(14695981039346656037)
+        # Powers of the prime for positions 0..max_count-1 (overflow wraps)
+        powers = np.cumprod(np.full(int(counts.max()), prime, dtype=np.uint64))
+        position = np.arange(xs.size) - np.repeat(offsets[:-1], counts)
+        terms = ((xs.view(np.uint64) ^ basis) * prime ^ ys.view(np.uint64)) * powers[position]
+        
+        hashes = np.zeros(len(counts), dtype=np.uint64)
+        nonempty = counts > 0
+        hashes[nonempty] = np.add.reduceat(terms, offsets[:-1][nonempty])
+        return hashes ^ (counts.astype(np.uint64) * prime)
+    
     def _remove_duplicates(self, path_data_list):
         """
-        Remove duplicate paths
+        Remove duplicate paths (and paths without points)
         """
-        unique_paths = []
-        seen_paths = set()
+        candidates = np.flatnonzero(path_data_list.counts() > 0)
+        hashes = self._path_hashes(path_data_list)[candidates]
         
-        for path_data in path_data_list:
-            # Create a simple hash of the path
-            if len(path_data['points']) > 0:
-                path_hash = hash(path_data['points'].tobytes())
-                
-                if path_hash not in seen_paths:
-                    seen_paths.add(path_hash)
-                    unique_paths.append(path_data)
+        # First occurrence of every distinct hash, in original order
+        _, first, inverse, sizes = np.unique(hashes, return_index=True, return_inverse=True,
+                                             return_counts=True)
+        keep = np.zeros(len(candidates), dtype=bool)
+        keep[first] = True
         
-        return unique_paths
-
+        # The hash only groups paths; within a shared hash compare the coordinates
+        shared = np.flatnonzero(sizes[inverse.ravel()] > 1)
+        if shared.size:
+            xs, ys, offsets = path_data_list.xs, path_data_list.ys, path_data_list.offsets
+            seen_paths = set()
+            for k in shared:
+                start, end = offsets[candidates[k]], offsets[candidates[k] + 1]
+                path_key = (xs[start:end].tobytes(), ys[start:end].tobytes())
+                keep[k] = path_key not in seen_paths
+                seen_paths.add(path_key)
+        return path_data_list.take(candidates[keep])
+    
     def _resample_polyline(self, points, n_points=50):
         """
         Resample polyline to fixed number of points along arc length
@@ -300,8 +508,8 @@ class SVGPathCleanup:
         # Precompute resampled polylines and lengths
         resampled = []
         lengths = []
-        for pd in path_data_list:
-            pts = pd['points']
+        for i in range(len(path_data_list)):
+            pts = path_data_list.points(i)
             res = self._resample_polyline(pts, n_points=min(80, max(10, len(pts))))
             resampled.append(res)
             lengths.append(self._calculate_path_length(pts))
@@ -310,9 +518,8 @@ class SVGPathCleanup:
             if used[i]:
                 continue
 
-            base = path_data_list[i]
             used[i] = True
-            to_keep = base
+            to_keep = i
 
             for j in range(i+1, len(path_data_list)):
                 if used[j]:
@@ -320,37 +527,45 @@ class SVGPathCleanup:
                 mean_d, max_d = self._bidirectional_mean_distance(resampled[i], resampled[j])
                 if mean_d <= distance_thresh and max_d <= distance_thresh * 2.5:
                     # treat as near duplicate; keep longer
-                    if lengths[j] > lengths[path_data_list.index(to_keep)]:
-                        to_keep = path_data_list[j]
+                    if lengths[j] > lengths[to_keep]:
+                        to_keep = j
                     used[j] = True
 
             kept.append(to_keep)
 
-        # Recompute 'd' strings from points to ensure consistency
-        out = []
-        for pd in kept:
-            out.append({
-                'element': pd['element'],
-                'd': self._points_to_path_d(pd['points']),
-                'stroke': pd['stroke'],
-                'points': pd['points']
-            })
+        # 'd' strings are regenerated from points to ensure consistency
+        out = path_data_list.take(kept)
+        out.ds = [None] * len(out)
         return out
     
+    def _path_lengths(self, path_data_list):
+        """
+        Total length of every path in the buffer, computed in one pass
+        """
+        xs, ys, offsets = path_data_list.xs, path_data_list.ys, path_data_list.offsets
+        counts = path_data_list.counts()
+        lengths = np.zeros(len(counts))
+        nonempty = counts > 0
+        if xs.size < 2 or not nonempty.any():
+            return lengths
+        
+        # Segment k joins point k and k+1; the segment leaving the last point
+        # of a path crosses into the next path and must not be counted.
+        seg = np.zeros(xs.size)
+        dx = np.diff(xs)
+        dy = np.diff(ys)
+        seg[:-1] = np.sqrt(dx * dx + dy * dy)
+        seg[offsets[1:][nonempty] - 1] = 0.0
+        lengths[nonempty] = np.add.reduceat(seg, offsets[:-1][nonempty])
+        return lengths
+    
     def _remove_short_paths(self, path_data_list, min_length):
         """
         Remove paths shorter than min_length
         """
-        filtered = []
-        
-        for path_data in path_data_list:
-            points = path_data['points']
-            if len(points) >= 2:
-                length = self._calculate_path_length(points)
-                if length >= min_length:
-                    filtered.append(path_data)
-        
-        return filtered
+        lengths = self._path_lengths(path_data_list)
+        keep = (path_data_list.counts() >= 2) & (lengths >= min_length)
+        return path_data_list.take(np.flatnonzero(keep))
     
     def _merge_close_paths(self, path_data_list, max_distance):
         """
@@ -359,31 +574,32 @@ class SVGPathCleanup:
         if len(path_data_list) < 2:
             return path_data_list
         
-        merged = []
+        merged_points_list = []
+        merged_strokes = []
         used = set()
+        all_points = [path_data_list.points(i) for i in range(len(path_data_list))]
         
-        for i, path1 in enumerate(path_data_list):
+        for i, points1 in enumerate(all_points):
             if i in used:
                 continue
             
-            points1 = path1['points']
             if len(points1) < 2:
                 continue
             
-            # Try to find a path to merge with
-            merged_points = points1.copy()
-            current_end = merged_points[-1]
+            # Try to find a path to merge with; chain pieces are collected
+            # and concatenated once to avoid re-copying the chain per merge
+            chunks = [points1]
+            current_end = chunks[-1][-1]
             used.add(i)
             
             changed = True
             while changed:
                 changed = False
                 
-                for j, path2 in enumerate(path_data_list):
+                for j, points2 in enumerate(all_points):
                     if j in used or j == i:
                         continue
                     
-                    points2 = path2['points']
                     if len(points2) < 2:
                         continue
                     
@@ -393,29 +609,24 @@ class SVGPathCleanup:
                     
                     if dist_to_start <= max_distance:
                         # Connect to start of path2
-                        merged_points = np.vstack([merged_points, points2])
-                        current_end = merged_points[-1]
+                        chunks.append(points2)
+                        current_end = chunks[-1][-1]
                         used.add(j)
                         changed = True
                         break
                     elif dist_to_end <= max_distance:
                         # Connect to end of path2 (reversed)
-                        merged_points = np.vstack([merged_points, points2[::-1]])
-                        current_end = merged_points[-1]
+                        chunks.append(points2[::-1])
+                        current_end = chunks[-1][-1]
                         used.add(j)
                         changed = True
                         break
             
             # Create merged path
-            merged_d = self._points_to_path_d(merged_points)
-            merged.append({
-                'element': path1['element'],
-                'd': merged_d,
-                'stroke': path1['stroke'],
-                'points': merged_points
-            })
+            merged_points_list.append(np.concatenate(chunks, axis=0))
+            merged_strokes.append(path_data_list.strokes[i])
         
-        return merged
+        return PathBuffer.from_points(merged_points_list, merged_strokes)
     
     def _simplify_paths(self, path_data_list, tolerance):
         """
@@ -424,127 +635,63 @@ class SVGPathCleanup:
         if tolerance <= 0:
             return path_data_list
         
-        simplified = []
+        xs, ys, offsets = path_data_list.xs, path_data_list.ys, path_data_list.offsets
+        ds = [None if n >= 3 else d for n, d in zip(path_data_list.counts(), path_data_list.ds)]
         
-        for path_data in path_data_list:
-            points = path_data['points']
-            if len(points) < 3:
-                simplified.append(path_data)
-                continue
-            
-            # Douglas-Peucker simplification
-            simplified_points = self._douglas_peucker(points, tolerance)
-            
-            if len(simplified_points) >= 2:
-                simplified_d = self._points_to_path_d(simplified_points)
-                simplified.append({
-                    'element': path_data['element'],
-                    'd': simplified_d,
-                    'stroke': path_data['stroke'],
-                    'points': simplified_points
-                })
-        
-        return simplified
-    
-    def _douglas_peucker(self, points, tolerance):
-        """
-        Douglas-Peucker path simplification algorithm
-        """
-        if len(points) < 3:
-            return points
-        
-        # Find the point with maximum distance
-        start = points[0]
-        end = points[-1]
-        
-        max_dist = 0
-        max_idx = 0
-        
-        for i in range(1, len(points) - 1):
-            dist = self._point_line_distance(points[i], start, end)
-            if dist > max_dist:
-                max_dist = dist
-                max_idx = i
+        # Both implementations mark the kept points in one mask over the
+        # whole buffer; a prefix sum over the mask gives the new offsets.
+        keep = np.zeros(xs.size, dtype=np.bool_)
         
-        # If max distance is greater than tolerance, recursively simplify
-        if max_dist > tolerance:
-            # Recursive call
-            left = self._douglas_peucker(points[:max_idx + 1], tolerance)
-            right = self._douglas_peucker(points[max_idx:], tolerance)
-            
-            # Combine (remove duplicate middle point)
-            return np.vstack([left[:-1], right])
-        else:
-            # Return endpoints only
-            return np.array([start, end])
-    
-    def _point_line_distance(self, point, line_start, line_end):
-        """
-        Calculate perpendicular distance from point to line
-        """
-        if np.allclose(line_start, line_end):
-            return np.linalg.norm(point - line_start)
-        
-        # Vector from line_start to line_end
-        line_vec = line_end - line_start
-        line_len = np.linalg.norm(line_vec)
-        line_unitvec = line_vec / line_len
+        if njit is not None:
+            # Compiled kernel handles all paths in parallel
+            _dp_keep_mask_numba(xs, ys, offsets, float(tolerance) ** 2, keep)
+        elif xs.size > 0:
+            # One (max_len, 2) scratch array is reused for every path, and
+            # each path's mask is written straight into its slice of keep
+            scratch = np.empty((int(path_data_list.counts().max()), 2))
+            for i in range(len(path_data_list)):
+                start, end = offsets[i], offsets[i + 1]
+                points = scratch[:end - start]
+                points[:, 0] = xs[start:end]
+                points[:, 1] = ys[start:end]
+                _dp_numpy(points, tolerance, out=keep[start:end])
         
-        # Vector from line_start to point
-        point_vec = point - line_start
-        
-        # Project point onto line
-        projection_length = np.dot(point_vec, line_unitvec)
-        
-        if projection_length < 0:
-            return np.linalg.norm(point - line_start)
-        elif projection_length > line_len:
-            return np.linalg.norm(point - line_end)
-        else:
-            projection = line_start + projection_length * line_unitvec
-            return np.linalg.norm(point - projection)
+        kept_before = np.zeros(xs.size + 1, dtype=np.int64)
+        np.cumsum(keep, out=kept_before[1:])
+        return PathBuffer(xs[keep], ys[keep], kept_before[offsets],
+                          list(path_data_list.strokes), ds)
     
     def _round_coordinates(self, path_data_list, decimal_places):
         """
         Round coordinates to specified decimal places
         """
-        rounded = []
-        
-        for path_data in path_data_list:
-            points = path_data['points']
-            rounded_points = np.round(points, decimal_places)
-            rounded_d = self._points_to_path_d(rounded_points)
-            
-            rounded.append({
-                'element': path_data['element'],
-                'd': rounded_d,
-                'stroke': path_data['stroke'],
-                'points': rounded_points
-            })
-        
-        return rounded
+        # Every stage returns a buffer with its own arrays, so round in place
+        np.round(path_data_list.xs, decimal_places, out=path_data_list.xs)
+        np.round(path_data_list.ys, decimal_places, out=path_data_list.ys)
+        path_data_list.ds = [None] * len(path_data_list)
+        return path_data_list
     
-    def _points_to_path_d(self, points):
+    def _points_to_path_d(self, xs, ys):
         """
-        Convert points array to SVG path d attribute
+        Convert coordinate arrays to SVG path d attribute
         """
-        if len(points) == 0:
+        if len(xs) == 0:
             return ""
         
-        d_parts = [f"M {points[0][0]:.2f},{points[0][1]:.2f}"]
+        coords = zip(xs.tolist(), ys.tolist())
+        x0, y0 = next(coords)
+        d_parts = [f"M {x0:.2f},{y0:.2f}"]
         
-        for point in points[1:]:
-            d_parts.append(f"L {point[0]:.2f},{point[1]:.2f}")
+        for x, y in coords:
+            d_parts.append(f"L {x:.2f},{y:.2f}")
         
         return " ".join(d_parts)
     
-    def _pretty_print_svg(self, svg_string):
+    def _pretty_print_svg(self, root):
         """
-        Add proper indentation to SVG
+        Add proper indentation to the SVG tree (in place, before serializing)
         """
-        # Simple pretty printing
-        svg_string = svg_string.replace('><', '>\n<')
-        return svg_string
+        ET.indent(root, space='  ')
 
 
 NODE_CLASS_MAPPINGS = {
@@ -23,6 +23,8 @@ import json
 from typing import List, Dict, Any, Optional
 from xml.etree import ElementTree as ET
 
+from .svg_cache import SVG_NS, SVG_TAGS, parse_svg, remember_svg, cached_result, store_result
+
 
 class SVGReorder:
     @classmethod
@@ -47,9 +49,14 @@ class SVGReorder:
     CATEGORY = "TJ_Vector"
 
     def reorder(self, svg_string: str, order_rules_json: str = "[]", reverse_order: bool = False):
+        cache_key = ("SVGReorder", svg_string, order_rules_json, reverse_order)
+        cached = cached_result(cache_key)
+        if cached is not None:
+            return cached
+
         # Parse SVG
         try:
-            root = ET.fromstring(svg_string)
+            root = parse_svg(svg_string)
         except Exception as e:
             return (svg_string, json.dumps({"error": f"SVG parse error: {e}"}))
 
@@ -65,7 +72,7 @@ class SVGReorder:
         # Find the main group (usually <g id="centerlines"> or direct children of root)
         # Reorder within the first <g> if exists, otherwise reorder direct children
         target_parent = None
-        ns_g = "{http://www.w3.org/2000/svg}g"
+        ns_g = SVG_NS + "g"
         for child in root:
             if child.tag == ns_g or child.tag.endswith('}g'):
                 target_parent = child
@@ -118,8 +125,9 @@ class SVGReorder:
         
         # Convert back to string
         output_svg = ET.tostring(root, encoding="unicode")
+        remember_svg(output_svg, root)
         
-        return (output_svg, json.dumps(stats, indent=2))
+        return store_result(cache_key, (output_svg, json.dumps(stats, indent=2)))
 
     def _find_elements_by_selector(self, root: ET.Element, selector: str) -> List[ET.Element]:
         """Find all elements matching a simple selector"""
@@ -142,11 +150,9 @@ class SVGReorder:
                     results.append(elem)
         
         # Tag selector: g, path, etc.
-        elif s in ["g", "path", "rect", "circle", "ellipse", "line", "polyline", "polygon", "text"]:
-            ns_tag = f"{{http://www.w3.org/2000/svg}}{s}"
-            for elem in root.iter():
-                if elem.tag == ns_tag or elem.tag == s or elem.tag.endswith(f'}}{s}'):
-                    results.append(elem)
+        elif s in SVG_TAGS:
+            # Match the local name in any namespace (and un-namespaced elements)
+            results = [elem for elem in root.iter() if elem.tag.rpartition("}")[2] == s]
         
         # Attribute contains selector: [attr*=value]
         elif s.startswith("[") and s.endswith("]") and "*=" in s:
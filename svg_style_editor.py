@@ -21,6 +21,8 @@ import json
 from typing import List, Dict, Any, Optional
 from xml.etree import ElementTree as ET
 
+from .svg_cache import SVG_TAGS, parse_svg, remember_svg, cached_result, store_result
+
 
 class SVGStyleEditor:
     @classmethod
@@ -44,9 +46,14 @@ class SVGStyleEditor:
     CATEGORY = "TJ_Vector"
 
     def edit_styles(self, svg_string: str, style_rules_json: str = "[]"):
+        cache_key = ("SVGStyleEditor", svg_string, style_rules_json)
+        cached = cached_result(cache_key)
+        if cached is not None:
+            return cached
+
         # Parse SVG
         try:
-            root = ET.fromstring(svg_string)
+            root = parse_svg(svg_string)
         except Exception as e:
             return (svg_string, json.dumps({"error": f"SVG parse error: {e}"}))
 
@@ -95,8 +102,9 @@ class SVGStyleEditor:
 
         # Convert back to string
         output_svg = ET.tostring(root, encoding="unicode")
+        remember_svg(output_svg, root)
         
-        return (output_svg, json.dumps(stats, indent=2))
+        return store_result(cache_key, (output_svg, json.dumps(stats, indent=2)))
 
     def _find_elements_by_selector(self, root: ET.Element, selector: str) -> List[ET.Element]:
         """Find all elements matching a simple selector"""
@@ -119,11 +127,9 @@ class SVGStyleEditor:
                     results.append(elem)
         
         # Tag selector: g, path, etc.
-        elif s in ["g", "path", "rect", "circle", "ellipse", "line", "polyline", "polygon", "text"]:
-            ns_tag = f"{{http://www.w3.org/2000/svg}}{s}"
-            for elem in root.iter():
-                if elem.tag == ns_tag or elem.tag == s or elem.tag.endswith(f'}}{s}'):
-                    results.append(elem)
+        elif s in SVG_TAGS:
+            # Match the local name in any namespace (and un-namespaced elements)
+            results = [elem for elem in root.iter() if elem.tag.rpartition("}")[2] == s]
         
         # Attribute contains selector: [attr*=value]
         elif s.startswith("[") and s.endswith("]") and "*=" in s:
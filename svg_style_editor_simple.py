@@ -18,8 +18,71 @@ Outputs:
 
 import json
 import re
-from typing import List, Set
-from xml.etree import ElementTree as ET
+from bisect import bisect_right
+from itertools import chain
+from typing import Iterator, List, Tuple
+
+try:
+    # libxml2-based parser/serializer; much faster on large SVGs
+    from lxml import etree as ET
+except ImportError:
+    from xml.etree import ElementTree as ET
+
+
+_NS_PATH = "{http://www.w3.org/2000/svg}path"
+
+# Index sets with every index below this use a bitmap (128 KiB max)
+_BITMAP_LIMIT = 1 << 20
+
+
+class _IndexSet:
+    """
+    Set of path indices stored as merged [start, end] ranges.
+    Membership is a bitmap test when all indices are below _BITMAP_LIMIT,
+    otherwise a bisect over the ranges. Iterates in ascending order.
+    """
+
+    def __init__(self, ranges: List[Tuple[int, int]]):
+        merged: List[List[int]] = []
+        for start, end in sorted(ranges):
+            if merged and start <= merged[-1][1] + 1:
+                merged[-1][1] = max(merged[-1][1], end)
+            else:
+                merged.append([start, end])
+        self._starts = [start for start, _ in merged]
+        self._ends = [end for _, end in merged]
+        self._bitmap = None
+        if merged and self._ends[-1] < _BITMAP_LIMIT:
+            bitmap = bytearray((self._ends[-1] >> 3) + 1)
+            for start, end in merged:
+                # Whole bytes at once, single bits at the edges
+                lo, hi = (start + 7) >> 3, (end + 1) >> 3
+                if lo < hi:
+                    bitmap[lo:hi] = b"\xff" * (hi - lo)
+                    edges = chain(range(start, lo << 3), range(hi << 3, end + 1))
+                else:
+                    edges = range(start, end + 1)
+                for i in edges:
+                    bitmap[i >> 3] |= 1 << (i & 7)
+            self._bitmap = bitmap
+
+    def __contains__(self, idx: int) -> bool:
+        bitmap = self._bitmap
+        if bitmap is not None:
+            return 0 <= idx and (idx >> 3) < len(bitmap) and bool(bitmap[idx >> 3] & (1 << (idx & 7)))
+        k = bisect_right(self._starts, idx) - 1
+        return k >= 0 and idx <= self._ends[k]
+
+    def __iter__(self) -> Iterator[int]:
+        return chain.from_iterable(range(start, end + 1) for start, end in zip(self._starts, self._ends))
+
+    def __bool__(self) -> bool:
+        return bool(self._starts)
+
+    @property
+    def last(self) -> int:
+        """Highest index (set must be non-empty)"""
+        return self._ends[-1]
 
 
 class SVGStyleEditorSimple:
@@ -71,12 +134,6 @@ class SVGStyleEditorSimple:
                     stroke_width: float = 0.0,
                     fill_color: str = "",
                     opacity: float = -1.0):
-        # Parse SVG
-        try:
-            root = ET.fromstring(svg_string)
-        except Exception as e:
-            return (svg_string, json.dumps({"error": f"SVG parse error: {e}"}))
-
         # Parse path indices
         target_indices = self._parse_indices(path_indices)
         
@@ -85,15 +142,35 @@ class SVGStyleEditorSimple:
             return (svg_string, json.dumps({"error": "Invalid path_indices format"}))
 
         stats = {
-            "target_indices": sorted(list(target_indices)) if target_indices else "all",
+            "target_indices": list(target_indices) if target_indices else "all",
             "modified_count": 0
         }
 
-        # Find all path elements
-        ns_path = "{http://www.w3.org/2000/svg}path"
-        all_paths = list(root.iter(ns_path))
+        # Attribute values are the same for every path; build them once
+        stroke_str = stroke_color.strip() if stroke_color else ""
+        sw_str = str(stroke_width) if stroke_width > 0 else None
+        fill_str = fill_color.strip() if fill_color else ""
+        op_str = str(opacity) if opacity >= 0.0 else None
+
+        # Nothing to apply: pass the SVG through without a parse/serialize round trip
+        if not (stroke_str or sw_str or fill_str or op_str):
+            return (svg_string, json.dumps(stats, indent=2))
+
+        # Parse SVG
+        try:
+            # Parse bytes: lxml rejects str input with an encoding declaration
+            root = ET.fromstring(svg_string.encode("utf-8"))
+        except Exception as e:
+            return (svg_string, json.dumps({"error": f"SVG parse error: {e}"}))
+
+        # With explicit indices, paths after the highest one need no visit
+        last_index = target_indices.last if target_indices else None
         
-        for idx, path_elem in enumerate(all_paths):
+        # Walk path elements lazily; only attributes change, so the tree walk stays valid
+        for idx, path_elem in enumerate(root.iter(_NS_PATH)):
+            if last_index is not None and idx > last_index:
+                break
+            
             # Check if this path should be modified
             if target_indices and idx not in target_indices:
                 continue
@@ -101,36 +178,40 @@ class SVGStyleEditorSimple:
             # Apply style changes
             modified = False
             
-            if stroke_color and stroke_color.strip():
-                path_elem.set("stroke", stroke_color.strip())
+            if stroke_str:
+                path_elem.set("stroke", stroke_str)
                 modified = True
             
-            if stroke_width > 0:
-                path_elem.set("stroke-width", str(stroke_width))
+            if sw_str is not None:
+                path_elem.set("stroke-width", sw_str)
                 modified = True
             
-            if fill_color and fill_color.strip():
-                path_elem.set("fill", fill_color.strip())
+            if fill_str:
+                path_elem.set("fill", fill_str)
                 modified = True
             
-            if opacity >= 0.0:
-                path_elem.set("opacity", str(opacity))
+            if op_str is not None:
+                path_elem.set("opacity", op_str)
                 modified = True
             
             if modified:
                 stats["modified_count"] += 1
 
+        # No path matched: the input is already the result, skip re-serializing
+        if stats["modified_count"] == 0:
+            return (svg_string, json.dumps(stats, indent=2))
+
         # Convert back to string
         output_svg = ET.tostring(root, encoding="unicode")
         
         return (output_svg, json.dumps(stats, indent=2))
 
-    def _parse_indices(self, indices_str: str) -> Set[int]:
+    def _parse_indices(self, indices_str: str) -> _IndexSet:
         """Parse comma-separated indices with range support (e.g., '0,2-5,10')"""
         if not indices_str or not indices_str.strip():
-            return set()
+            return _IndexSet([])
         
-        result = set()
+        ranges = []
         parts = indices_str.split(",")
         
         for part in parts:
@@ -144,17 +225,19 @@ class SVGStyleEditorSimple:
                     start, end = part.split("-", 1)
                     start_idx = int(start.strip())
                     end_idx = int(end.strip())
-                    result.update(range(start_idx, end_idx + 1))
+                    if start_idx <= end_idx:
+                        ranges.append((start_idx, end_idx))
                 except ValueError:
                     continue
             else:
                 # Single number
                 try:
-                    result.add(int(part))
+                    idx = int(part)
+                    ranges.append((idx, idx))
                 except ValueError:
                     continue
         
-        return result
+        return _IndexSet(ranges)
 
 
 NODE_CLASS_MAPPINGS = {
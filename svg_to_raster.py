@@ -1,17 +1,67 @@
 """
 SVG To Raster Node for ComfyUI
-Converts SVG string to ComfyUI IMAGE tensor using Pillow (fallback renderer)
-Note: Uses basic SVG path rendering; complex features may not render perfectly.
+Converts SVG string to ComfyUI IMAGE tensor using skia-python when installed,
+otherwise Pillow (fallback renderer)
+Note: The Pillow fallback uses basic SVG path rendering; complex features may not render perfectly.
 """
 
+import copy
+import functools
 import io
 import json
+import os
 import re
+import warnings
+from concurrent.futures import ThreadPoolExecutor
 from typing import Tuple, Optional, List
 import numpy as np
 import torch
 from PIL import Image, ImageOps, ImageDraw
-from xml.etree import ElementTree as ET
+
+try:
+    # libxml2-based parser/serializer; much faster on large SVGs
+    from lxml import etree as ET
+except ImportError:
+    from xml.etree import ElementTree as ET
+
+try:
+    # Compiled SVG renderer (real curves, anti-aliasing, full styling)
+    import skia
+except ImportError:
+    skia = None
+
+
+# Path data tokens: a command letter or a number (exponents allowed)
+_SVG_PATH_TOKEN_RE = re.compile(r'[MLHVCSQTAZmlhvcsqtaz]|[-+]?[0-9]*\.?[0-9]+(?:[eE][-+]?[0-9]+)?')
+# Command letter -> absolute command; numbers map to None
+_PATH_COMMANDS = {c: c.upper() for c in "MLHVCSQTAZmlhvcsqtaz"}
+_NS_PATH = "{http://www.w3.org/2000/svg}path"
+# Serialize xlink:href under its usual prefix (ElementTree would write "ns1:href",
+# which skia ignores, dropping every <use> reference)
+ET.register_namespace("xlink", "http://www.w3.org/1999/xlink")
+# Plain polyline "M x y L x y ... [Z]" (the common tracer output); parsed without the tokenizer
+# Digits split only one way (not "[0-9]*\.?[0-9]+"), so a failed fullmatch such as
+# "M 10 20 L 11 21 ... H 5" stays linear instead of retrying every digit split
+_NUM = r'[-+]?(?:[0-9]+(?:\.[0-9]+)?|\.[0-9]+)(?:[eE][-+]?[0-9]+)?'
+_POLYLINE_RE = re.compile(
+    rf'\s*[Mm]\s*{_NUM}(?:\s*,\s*|\s+){_NUM}(?:\s*[Ll]\s*{_NUM}(?:\s*,\s*|\s+){_NUM})*\s*([Zz])?\s*')
+_POLYLINE_SEPARATORS = str.maketrans("MmLlZz,", "       ")
+# skia's SVG parser ignores #RRGGBBAA (the format the TJ_Vector color nodes emit) but reads rgba()
+_HEX_RGBA_RE = re.compile(r'#[0-9a-fA-F]{8}(?![0-9a-zA-Z_-])')
+_SKIA_COLOR_ATTRS = ("fill", "stroke", "stop-color", "flood-color", "lighting-color", "color")
+
+
+@functools.lru_cache(maxsize=8)
+def _parse_svg_root(svg_string: str):
+    """
+    Parse an SVG string once; repeated renders of the same SVG reuse the tree.
+    The returned root is shared and must not be modified. None on parse error.
+    """
+    try:
+        # Parse bytes: lxml rejects str input with an encoding declaration
+        return ET.fromstring(svg_string.encode("utf-8"))
+    except Exception:
+        return None
 
 
 class SVGToImage:
@@ -48,49 +98,74 @@ class SVGToImage:
     RETURN_NAMES = ("image", "meta")
     FUNCTION = "render"
     CATEGORY = "TJ_Vector"
+    # Inputs arrive as lists, so a list of SVG strings renders as one IMAGE batch
+    INPUT_IS_LIST = True
 
-    def render(self, svg_string: str, width: int = 0, height: int = 0, scale: float = 1.0,
+    def render(self, svg_string: List[str], width: int = 0, height: int = 0, scale: float = 1.0,
                background: str = "transparent", background_color: str = "#00000000",
                dpi: int = 96, padding: int = 0, 
                override_stroke_color: str = "", override_stroke_width: float = 0.0, override_fill_color: str = "",
                show_control_points: bool = False, control_point_size: int = 4, control_point_color: str = "#FF0000",
                antialias: bool = True, clip_to_viewbox: bool = True):
+        # Settings are lists too (INPUT_IS_LIST); the first value applies to the whole batch
+        (width, height, scale, background, background_color, dpi, padding, override_stroke_color,
+         override_stroke_width, override_fill_color, show_control_points, control_point_size,
+         control_point_color, antialias, clip_to_viewbox) = (
+            value[0] if isinstance(value, list) and value else value
+            for value in (width, height, scale, background, background_color, dpi, padding,
+                          override_stroke_color, override_stroke_width, override_fill_color,
+                          show_control_points, control_point_size, control_point_color,
+                          antialias, clip_to_viewbox))
+
+        # A list of SVG strings renders as one batch at the first SVG's size
+        svg_strings = list(svg_string) if isinstance(svg_string, (list, tuple)) else [svg_string]
+        if not svg_strings:
+            svg_strings = [""]
+
+        # Parse once; shared by size inference and rendering
+        roots = [_parse_svg_root(s) for s in svg_strings]
+
         # Compute base size from SVG
-        base_w, base_h = self._infer_svg_size(svg_string)
+        base_w, base_h = self._infer_svg_size_from_root(roots[0])
 
         # Resolve target size
         tgt_w, tgt_h = self._resolve_size(base_w, base_h, width, height, scale)
 
-        # Render SVG using basic PIL-based path renderer
-        try:
-            img = self._render_svg_basic(svg_string, int(tgt_w), int(tgt_h), background, background_color,
-                                         override_stroke_color, override_stroke_width, override_fill_color,
-                                         show_control_points, control_point_size, control_point_color)
-        except Exception as e:
-            # Fallback: create error placeholder
-            img = Image.new("RGBA", (int(tgt_w), int(tgt_h)), (255, 0, 0, 128))
-            draw = ImageDraw.Draw(img)
-            draw.text((10, 10), f"SVG render error:\n{str(e)}", fill=(255, 255, 255, 255))
-            print(f"SVG rendering error: {e}")
-
-        # Optional padding
-        if padding > 0:
-            if background == "transparent":
-                pad_color = (0, 0, 0, 0)
-            elif background == "white":
-                pad_color = (255, 255, 255, 255)
-            elif background == "black":
-                pad_color = (0, 0, 0, 255)
-            else:
-                pad_color = self._parse_rgba(self._normalize_color(background_color))
-            img = ImageOps.expand(img, border=padding, fill=pad_color)
+        render_one = functools.partial(
+            self._render_image, width=int(tgt_w), height=int(tgt_h), background=background,
+            background_color=background_color, padding=padding,
+            override_stroke_color=override_stroke_color, override_stroke_width=override_stroke_width,
+            override_fill_color=override_fill_color, show_control_points=show_control_points,
+            control_point_size=control_point_size, control_point_color=control_point_color)
+        if len(roots) > 1:
+            # Rasterization runs in C (skia/Pillow); render the batch on worker threads
+            with ThreadPoolExecutor(max_workers=min(8, os.cpu_count() or 1, len(roots))) as executor:
+                imgs = list(executor.map(render_one, roots, svg_strings))
+        else:
+            imgs = [render_one(roots[0], svg_strings[0])]
+        img = imgs[0]
 
         # Convert to tensor IMAGE (B,H,W,C) in 0..1
-        arr = np.array(img).astype(np.float32) / 255.0
-        tensor = torch.from_numpy(arr).unsqueeze(0)
+        # uint8 view of the image(s); cast and scale in one torch pass
+        if len(imgs) > 1:
+            arr = np.stack([np.asarray(i) for i in imgs])
+        else:
+            arr = np.asarray(img)[None]
+        if not arr.flags["C_CONTIGUOUS"]:
+            arr = np.ascontiguousarray(arr)
+        if torch.cuda.is_available():
+            # Pinned host memory lets the downstream .to("cuda", non_blocking=True) copy asynchronously
+            tensor = torch.empty(arr.shape, dtype=torch.float32, pin_memory=True)
+            np.divide(arr, np.float32(255.0), out=tensor.numpy())
+        else:
+            with warnings.catch_warnings():
+                # PIL's buffer is read-only; .float() copies before anything is written
+                warnings.simplefilter("ignore", UserWarning)
+                tensor = torch.from_numpy(arr).float().div_(255.0)
 
         bg_str = background if background != "custom" else background_color
         meta = {
+            "batch_size": len(imgs),
             "final_size": [int(img.width), int(img.height)],
             "base_size": [int(base_w), int(base_h)],
             "requested": {"width": int(width), "height": int(height), "scale": float(scale)},
@@ -114,31 +189,52 @@ class SVGToImage:
         return (tensor, json.dumps(meta, indent=2))
 
     # ----- helpers -----
-    def _render_svg_basic(self, svg_string: str, width: int, height: int, background: str, bg_color: str,
+    def _render_image(self, root, svg_string: str, width: int, height: int, background: str, background_color: str, padding: int,
+                      override_stroke_color: str, override_stroke_width: float, override_fill_color: str,
+                      show_control_points: bool, control_point_size: int, control_point_color: str) -> Image.Image:
+        """
+        Render one parsed SVG to its final image (padding and RGB/RGBA mode applied).
+        """
+        # Render SVG using basic PIL-based path renderer
+        try:
+            img = self._render_svg_basic(root, svg_string, width, height, background, background_color,
+                                         override_stroke_color, override_stroke_width, override_fill_color,
+                                         show_control_points, control_point_size, control_point_color)
+        except Exception as e:
+            # Fallback: create error placeholder
+            img = Image.new("RGBA", (width, height), (255, 0, 0, 128))
+            draw = ImageDraw.Draw(img)
+            draw.text((10, 10), f"SVG render error:\n{str(e)}", fill=(255, 255, 255, 255))
+            print(f"SVG rendering error: {e}")
+
+        # Optional padding
+        if padding > 0:
+            pad_color = self._background_rgba(background, background_color)
+            img = ImageOps.expand(img, border=padding, fill=pad_color)
+
+        # Opaque background: emit a 3-channel IMAGE instead. The Pillow renderer (and the
+        # error placeholder) write translucent colors' alpha rather than blending, so
+        # flatten such pixels onto the background before dropping the channel
+        if self._is_opaque_background(background, background_color):
+            if img.getextrema()[3] != (255, 255):
+                bg = Image.new("RGBA", img.size, self._background_rgba(background, background_color))
+                img = Image.alpha_composite(bg, img)
+            img = img.convert("RGB")
+        return img
+
+    def _render_svg_basic(self, root, svg_string: str, width: int, height: int, background: str, bg_color: str,
                           override_stroke_color: str, override_stroke_width: float, override_fill_color: str,
                           show_control_points: bool, control_point_size: int, control_point_color: str) -> Image.Image:
         """
-        Basic SVG path renderer using PIL ImageDraw.
-        Limitations: Only supports simple path commands (M, L, C, Z); no complex styles/filters.
+        SVG renderer. Uses skia when installed; otherwise falls back to a basic
+        PIL ImageDraw path renderer.
+        Basic renderer limitations: Only supports simple path commands (M, L, C, Z); no complex styles/filters.
         """
-        # Create canvas
-        if background == "transparent":
-            img = Image.new("RGBA", (width, height), (0, 0, 0, 0))
-        elif background == "white":
-            img = Image.new("RGBA", (width, height), (255, 255, 255, 255))
-        elif background == "black":
-            img = Image.new("RGBA", (width, height), (0, 0, 0, 255))
-        else:
-            rgba = self._parse_rgba(self._normalize_color(bg_color))
-            img = Image.new("RGBA", (width, height), rgba)
-        
-        draw = ImageDraw.Draw(img, "RGBA")
+        # Canvas color
+        bg_rgba = self._background_rgba(background, bg_color)
         
-        # Parse SVG
-        try:
-            root = ET.fromstring(svg_string)
-        except:
-            return img  # return blank canvas on parse error
+        if root is None:
+            return Image.new("RGBA", (width, height), bg_rgba)  # return blank canvas on parse error
         
         # Get viewBox for coordinate transformation
         viewbox = root.get("viewBox") or root.get("viewbox")
@@ -155,24 +251,50 @@ class SVGToImage:
             scale_x = scale_y = 1
             vb_x = vb_y = 0
         
-        # Extract and render <path> elements
-        for path_elem in root.iter("{http://www.w3.org/2000/svg}path"):
-            d = path_elem.get("d")
+        # skia draws straight onto the background; its pixels become the canvas
+        img = None
+        if skia is not None:
+            img = self._render_svg_skia(root, svg_string, width, height, bg_rgba, override_stroke_color,
+                                        override_stroke_width, override_fill_color)
+            if img is not None and not show_control_points:
+                return img
+        compiled = img is not None
+        if img is None:
+            img = Image.new("RGBA", (width, height), bg_rgba)
+        
+        draw = ImageDraw.Draw(img, "RGBA")
+        
+        # Overrides are the same for every path
+        override_stroke = override_stroke_color.strip() if override_stroke_color else ""
+        override_fill = override_fill_color.strip() if override_fill_color else ""
+        
+        # Per-render color cache; SVGs typically reuse a small palette
+        color_cache = {}
+        
+        def color_rgba(color):
+            try:
+                return color_cache[color]
+            except KeyError:
+                rgba = color_cache[color] = self._color_to_rgba(color)
+                return rgba
+        
+        # Control point coordinates of every path; markers are stamped in one pass at the end
+        cp_coords = []
+        
+        # Extract and render <path> elements (control points only after skia)
+        for path_elem in root.iter(_NS_PATH):
+            get_attr = path_elem.get
+            d = get_attr("d")
             if not d:
                 continue
             
-            # Parse stroke/fill
-            stroke_color = path_elem.get("stroke", "black")
-            fill_color = path_elem.get("fill", "none")
-            stroke_width = float(path_elem.get("stroke-width", 1))
-            
-            # Apply overrides
-            if override_stroke_color and override_stroke_color.strip():
-                stroke_color = override_stroke_color.strip()
+            # Stroke/fill: overrides win; the element is only read for attributes not overridden
+            stroke_color = override_stroke or get_attr("stroke", "black")
+            fill_color = override_fill or get_attr("fill", "none")
             if override_stroke_width > 0:
                 stroke_width = override_stroke_width
-            if override_fill_color and override_fill_color.strip():
-                fill_color = override_fill_color.strip()
+            else:
+                stroke_width = float(get_attr("stroke-width", 1))
             
             # Convert path commands to coordinates
             coords = self._parse_svg_path(d, vb_x, vb_y, scale_x, scale_y)
@@ -180,50 +302,166 @@ class SVGToImage:
             if not coords or len(coords) < 2:
                 continue
             
-            # Draw path
-            if fill_color and fill_color.lower() != "none":
-                fill_rgba = self._color_to_rgba(fill_color)
+            # Draw path ("none"/empty colors map to None)
+            if not compiled:
+                fill_rgba = color_rgba(fill_color)
                 if fill_rgba:
                     draw.polygon(coords, fill=fill_rgba)
-            
-            if stroke_color and stroke_color.lower() != "none":
-                stroke_rgba = self._color_to_rgba(stroke_color)
+                
+                stroke_rgba = color_rgba(stroke_color)
                 if stroke_rgba:
                     draw.line(coords, fill=stroke_rgba, width=int(stroke_width * scale_x))
             
-            # Draw control points if enabled
-            if show_control_points and coords:
-                cp_rgba = self._color_to_rgba(control_point_color)
-                if cp_rgba:
-                    half_size = control_point_size // 2
-                    for x, y in coords:
-                        # Draw square marker
-                        draw.rectangle(
-                            [x - half_size, y - half_size, x + half_size, y + half_size],
-                            fill=cp_rgba,
-                            outline=cp_rgba
-                        )
+            if show_control_points:
+                cp_coords.append(coords)
+        
+        # Draw control points if enabled (on top of all paths)
+        if cp_coords:
+            cp_rgba = color_rgba(control_point_color)
+            if cp_rgba:
+                self._draw_control_points(img, cp_coords, control_point_size, cp_rgba)
         
         return img
     
+    def _draw_control_points(self, img: Image.Image, cp_coords: List[List[Tuple[float, float]]],
+                             control_point_size: int, cp_rgba: Tuple[int, int, int, int]) -> None:
+        """
+        Draw square markers at all control points with a single ImageDraw.point call.
+        Pixels match per-point ImageDraw.rectangle: corners truncated toward zero and
+        colors written without blending. Cost scales with the markers, not the image.
+        """
+        width, height = img.size
+        pts = np.concatenate([np.asarray(c, dtype=np.float64) for c in cp_coords])
+        pts = pts[np.isfinite(pts).all(axis=1)]
+        if width == 0 or height == 0 or len(pts) == 0:
+            return
+        half_size = control_point_size // 2
+        
+        # Inclusive pixel bounds per marker; keep markers that touch the canvas
+        lo = np.trunc(pts - half_size)
+        hi = np.trunc(pts + half_size)
+        visible = (hi[:, 0] >= 0) & (lo[:, 0] < width) & (hi[:, 1] >= 0) & (lo[:, 1] < height)
+        lo = lo[visible].astype(np.intp)
+        hi = hi[visible].astype(np.intp)
+        
+        if len(lo) == 0:
+            return
+        
+        # One vectorized step per marker offset (float rounding can add a pixel to 2 * half_size + 1)
+        span = int((hi - lo).max()) + 1
+        xs, ys = [], []
+        for dy in range(span):
+            y = lo[:, 1] + dy
+            row = (y <= hi[:, 1]) & (y >= 0) & (y < height)
+            for dx in range(span):
+                x = lo[:, 0] + dx
+                inside = row & (x <= hi[:, 0]) & (x >= 0) & (x < width)
+                xs.append(x[inside])
+                ys.append(y[inside])
+        xy = np.column_stack((np.concatenate(xs), np.concatenate(ys)))
+        if len(xy):
+            ImageDraw.Draw(img, "RGBA").point(xy.ravel().tolist(), fill=cp_rgba)
+    
+    def _render_svg_skia(self, root, svg_string: str, width: int, height: int, bg_rgba: Tuple[int, int, int, int],
+                         override_stroke_color: str, override_stroke_width: float,
+                         override_fill_color: str) -> Optional[Image.Image]:
+        """
+        Render the SVG with skia's SVG module onto a bg_rgba filled RGBA image.
+        Without overrides skia reads svg_string as is; otherwise they are applied to
+        a copy of the tree. Returns None if skia cannot render it.
+        """
+        try:
+            stroke = self._skia_color(override_stroke_color.strip()) if override_stroke_color else ""
+            fill = self._skia_color(override_fill_color.strip()) if override_fill_color else ""
+            # Cheap scan; a false hit (e.g. an 8-hex-digit id) only costs the rewrite below
+            hex_rgba = _HEX_RGBA_RE.search(svg_string) is not None
+            if not (stroke or fill or override_stroke_width > 0 or hex_rgba):
+                # Nothing to rewrite: no copy, no re-serialize, namespaces untouched
+                data = svg_string.encode("utf-8")
+            else:
+                doc = copy.deepcopy(root)
+                for elem in doc.iter():
+                    if not isinstance(elem.tag, str):
+                        continue  # comments / processing instructions (lxml)
+                    # skia matches plain tag names; drop namespaces (e.g. "ns0:path")
+                    elem.tag = elem.tag.rpartition("}")[2]
+                    if hex_rgba:
+                        for name in _SKIA_COLOR_ATTRS:
+                            value = elem.get(name)
+                            if value is not None:
+                                elem.set(name, self._skia_color(value.strip()))
+                        style = elem.get("style")
+                        if style:
+                            elem.set("style", _HEX_RGBA_RE.sub(lambda m: self._skia_color(m.group()), style))
+                    if elem.tag != "path":
+                        continue
+                    if stroke:
+                        elem.set("stroke", stroke)
+                    if override_stroke_width > 0:
+                        elem.set("stroke-width", str(override_stroke_width))
+                    if fill:
+                        elem.set("fill", fill)
+                if hasattr(ET, "cleanup_namespaces"):
+                    ET.cleanup_namespaces(doc)  # lxml: drop now-unused xmlns declarations
+                data = ET.tostring(doc)
+            
+            # copyData: the stream must not reference the temporary bytes object
+            dom = skia.SVGDOM.MakeFromStream(skia.MemoryStream(data, True))
+            if dom is None:
+                return None
+            surface = skia.Surface(width, height)
+            canvas = surface.getCanvas()
+            r, g, b, a = bg_rgba
+            canvas.clear(skia.ColorSetARGB(a, r, g, b))
+            size = dom.containerSize()
+            if size.width() > 0 and size.height() > 0:
+                canvas.scale(width / size.width(), height / size.height())
+            else:
+                dom.setContainerSize(skia.Size(width, height))
+            dom.render(canvas)
+            arr = surface.makeImageSnapshot().toarray(colorType=skia.kRGBA_8888_ColorType,
+                                                      alphaType=skia.kUnpremul_AlphaType)
+            return Image.fromarray(arr, "RGBA")
+        except Exception as e:
+            print(f"skia SVG render failed, using basic renderer: {e}")
+            return None
+    
+    def _skia_color(self, color: str) -> str:
+        """
+        #RRGGBBAA as rgba(), which skia understands; other colors unchanged.
+        """
+        if len(color) == 9 and _HEX_RGBA_RE.fullmatch(color):
+            r, g, b, a = self._parse_rgba(color)
+            return f"rgba({r},{g},{b},{round(a / 255, 4)})"
+        return color
+    
     def _parse_svg_path(self, d: str, offset_x: float, offset_y: float, scale_x: float, scale_y: float) -> List[Tuple[float, float]]:
         """
         Parse SVG path 'd' attribute into coordinate list.
         Supports: M (moveto), L (lineto), H/V (horizontal/vertical), C (cubic bezier), Z (closepath).
         """
-        coords = []
-        # Simple regex tokenizer
-        tokens = re.findall(r'[MLHVCSQTAZmlhvcsqtaz]|[-+]?[0-9]*\.?[0-9]+', d)
+        polyline = _POLYLINE_RE.fullmatch(d)
+        if polyline:
+            # Numbers only, parsed in C
+            coords = np.fromstring(d.translate(_POLYLINE_SEPARATORS), dtype=np.float64, sep=" ").reshape(-1, 2)
+            if polyline.group(1) and (coords[-1] != coords[0]).any():
+                coords = np.concatenate((coords, coords[:1]))
+            coords -= (offset_x, offset_y)
+            coords *= (scale_x, scale_y)
+            return list(map(tuple, coords.tolist()))
+        
+        points = []  # raw path coordinates; transformed in one step at the end
+        tokens = _SVG_PATH_TOKEN_RE.findall(d)
         
         i = 0
         current_x = current_y = 0
         start_x = start_y = 0
         
         while i < len(tokens):
-            cmd = tokens[i]
+            cmd = _PATH_COMMANDS.get(tokens[i])
             i += 1
             
-            if cmd.upper() == 'M':  # Move to
+            if cmd == 'M':  # Move to
                 if i < len(tokens):
                     x = float(tokens[i])
                     i += 1
@@ -232,9 +470,9 @@ class SVGToImage:
                     i += 1
                 current_x, current_y = x, y
                 start_x, start_y = x, y
-                coords.append(((current_x - offset_x) * scale_x, (current_y - offset_y) * scale_y))
+                points.append((current_x, current_y))
                 
-            elif cmd.upper() == 'L':  # Line to
+            elif cmd == 'L':  # Line to
                 if i < len(tokens):
                     x = float(tokens[i])
                     i += 1
@@ -242,23 +480,23 @@ class SVGToImage:
                     y = float(tokens[i])
                     i += 1
                 current_x, current_y = x, y
-                coords.append(((current_x - offset_x) * scale_x, (current_y - offset_y) * scale_y))
+                points.append((current_x, current_y))
                 
-            elif cmd.upper() == 'H':  # Horizontal line
+            elif cmd == 'H':  # Horizontal line
                 if i < len(tokens):
                     x = float(tokens[i])
                     i += 1
                 current_x = x
-                coords.append(((current_x - offset_x) * scale_x, (current_y - offset_y) * scale_y))
+                points.append((current_x, current_y))
                 
-            elif cmd.upper() == 'V':  # Vertical line
+            elif cmd == 'V':  # Vertical line
                 if i < len(tokens):
                     y = float(tokens[i])
                     i += 1
                 current_y = y
-                coords.append(((current_x - offset_x) * scale_x, (current_y - offset_y) * scale_y))
+                points.append((current_x, current_y))
                 
-            elif cmd.upper() == 'C':  # Cubic bezier (simplified: just use end point)
+            elif cmd == 'C':  # Cubic bezier (simplified: just use end point)
                 if i + 5 < len(tokens):
                     i += 4  # skip control points
                     x = float(tokens[i])
@@ -266,14 +504,21 @@ class SVGToImage:
                     y = float(tokens[i])
                     i += 1
                     current_x, current_y = x, y
-                    coords.append(((current_x - offset_x) * scale_x, (current_y - offset_y) * scale_y))
+                    points.append((current_x, current_y))
                     
-            elif cmd.upper() == 'Z':  # Close path
+            elif cmd == 'Z':  # Close path
                 if start_x != current_x or start_y != current_y:
-                    coords.append(((start_x - offset_x) * scale_x, (start_y - offset_y) * scale_y))
+                    points.append((start_x, start_y))
                 current_x, current_y = start_x, start_y
-                
-        return coords
+        
+        if not points:
+            return []
+        
+        # Map to image space: (p - offset) * scale for all points at once
+        coords = np.array(points, dtype=np.float64)
+        coords -= (offset_x, offset_y)
+        coords *= (scale_x, scale_y)
+        return list(map(tuple, coords.tolist()))
     
     def _color_to_rgba(self, color: str) -> Optional[Tuple[int, int, int, int]]:
         """Convert CSS color string to RGBA tuple."""
@@ -288,9 +533,10 @@ class SVGToImage:
         }
         return named.get(color.lower(), (0, 0, 0, 255))
     
-    def _infer_svg_size(self, svg: str) -> Tuple[int, int]:
+    def _infer_svg_size_from_root(self, root) -> Tuple[int, int]:
+        if root is None:
+            return 512, 512
         try:
-            root = ET.fromstring(svg)
             w_attr = root.get("width")
             h_attr = root.get("height")
             vb = root.get("viewBox") or root.get("viewbox")
@@ -326,6 +572,25 @@ class SVGToImage:
             return int(round((h * base_w / max(base_h, 1)) * scale)), int(round(h * scale))
         return int(round(base_w * scale)), int(round(base_h * scale))
 
+    def _background_rgba(self, background: str, bg_color: str) -> Tuple[int, int, int, int]:
+        if background == "transparent":
+            return (0, 0, 0, 0)
+        if background == "white":
+            return (255, 255, 255, 255)
+        if background == "black":
+            return (0, 0, 0, 255)
+        return self._parse_rgba(self._normalize_color(bg_color))
+
+    def _is_opaque_background(self, background: str, bg_color: str) -> bool:
+        if background == "transparent":
+            return False
+        if background in ("white", "black"):
+            return True
+        try:
+            return self._parse_rgba(self._normalize_color(bg_color))[3] == 255
+        except ValueError:
+            return False
+
     def _normalize_color(self, s: str) -> str:
         s = (s or "").strip()
         if not s:
@@ -359,6 +624,10 @@ class SVGToImage:
         s = (s or "#00000000").lstrip("#")
         if len(s) == 6:
             s += "FF"
+        if len(s) == 8 and s.isalnum():
+            # One parse + shifts (isalnum rules out signs/underscores int() would accept)
+            v = int(s, 16)
+            return (v >> 24, (v >> 16) & 0xFF, (v >> 8) & 0xFF, v & 0xFF)
         r = int(s[0:2], 16)
         g = int(s[2:4], 16)
         b = int(s[4:6], 16)
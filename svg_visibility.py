@@ -19,9 +19,167 @@ Outputs:
 - STRING: Meta JSON with visibility changes stats
 """
 
+import functools
+import io
 import json
-from typing import List, Dict, Any, Optional
-from xml.etree import ElementTree as ET
+from itertools import islice
+from typing import List, Dict, Any, Optional, Tuple
+
+from .svg_cache import SVG_TAGS, cached_result, store_result
+
+try:
+    # libxml2-based parser/serializer; much faster on large SVGs
+    from lxml import etree as ET
+    _LXML = True
+except ImportError:
+    from xml.etree import ElementTree as ET
+    _LXML = False
+
+
+def _xml_parser():
+    """
+    Parser for SVG input. Under lxml, huge_tree lifts libxml2's limits on text
+    size and tree depth so very large traced SVGs parse instead of failing.
+    """
+    # A fresh parser per call: lxml parser objects are not shared across threads
+    return ET.XMLParser(huge_tree=True) if _LXML else None
+
+
+@functools.lru_cache(maxsize=32)
+def _load_rules(visibility_rules_json: str) -> Tuple[Tuple[str, bool], ...]:
+    """
+    Parse the rules JSON into (selector, visible) pairs, skipping empty selectors.
+    Cached: workflow re-runs usually pass the same rules string again.
+    """
+    try:
+        rules = json.loads(visibility_rules_json)
+        if not isinstance(rules, list):
+            rules = []
+    except Exception:
+        rules = []
+    parsed = []
+    for rule in rules:
+        selector = str(rule.get("selector", "")).strip()
+        visible = bool(rule.get("visible", True))
+        if selector:
+            parsed.append((selector, visible))
+    return tuple(parsed)
+
+
+@functools.lru_cache(maxsize=512)
+def _parse_selector(s: str) -> Optional[Tuple[str, ...]]:
+    """
+    Split a simple selector into (kind, ...) once per distinct string:
+    ("id", id), ("class", name), ("tag", localname), ("contains", attr, value),
+    ("equals", attr, value); None if unsupported.
+    """
+    s = s.strip()
+    # ID selector: #id
+    if s.startswith("#"):
+        return ("id", s[1:])
+    # Class selector: .class
+    if s.startswith("."):
+        return ("class", s[1:])
+    # Tag selector: g, path, etc.
+    if s in SVG_TAGS:
+        return ("tag", s)
+    if s.startswith("[") and s.endswith("]"):
+        # Attribute contains selector: [attr*=value]
+        if "*=" in s:
+            attr_name, attr_value = s[1:-1].split("*=", 1)
+            return ("contains", attr_name.strip(), attr_value.strip().strip('"').strip("'"))
+        # Attribute equals selector: [attr=value]
+        if "=" in s:
+            attr_name, attr_value = s[1:-1].split("=", 1)
+            return ("equals", attr_name.strip(), attr_value.strip().strip('"').strip("'"))
+    return None
+
+
+@functools.lru_cache(maxsize=32)
+def _rule_attr_names(rules: Tuple[Tuple[str, bool], ...]) -> Tuple[str, ...]:
+    """Attributes that attribute selectors in the rules compare against"""
+    names = []
+    for selector, _ in rules:
+        parsed = _parse_selector(selector)
+        if parsed is None or parsed[0] not in ("contains", "equals"):
+            continue
+        # An empty [attr*=] matches every element without reading attr
+        if (parsed[0] == "equals" or parsed[2]) and parsed[1] not in names:
+            names.append(parsed[1])
+    return tuple(names)
+
+
+@functools.lru_cache(maxsize=32)
+def _rule_matcher(rules: Tuple[Tuple[str, bool], ...]):
+    """
+    Per-element form of the rules, for when no tree index exists (streaming).
+    Returns match(elem) -> visible flag of the last rule selecting elem, or None.
+    Mirrors _find_elements_by_selector.
+    """
+    by_id: Dict[str, Tuple[int, bool]] = {}
+    by_class: Dict[str, Tuple[int, bool]] = {}
+    by_tag: Dict[str, Tuple[int, bool]] = {}
+    attr_rules = []  # (order, visible, attr_name, attr_value, contains)
+    match_all = None  # last empty [attr*=] rule, which selects every element
+    for order, (selector, visible) in enumerate(rules):
+        parsed = _parse_selector(selector)
+        if parsed is None:
+            continue
+        kind = parsed[0]
+        # Later rules win, so plain assignment keeps the right one
+        if kind == "id":
+            by_id[parsed[1]] = (order, visible)
+        elif kind == "class":
+            by_class[parsed[1]] = (order, visible)
+        elif kind == "tag":
+            by_tag[parsed[1]] = (order, visible)
+        elif kind == "contains" and not parsed[2]:
+            match_all = (order, visible)
+        else:
+            attr_rules.append((order, visible, parsed[1], parsed[2], kind == "contains"))
+    attr_rules.reverse()  # newest first: the first hit is the winner among them
+
+    # Specialize for rule sets that need only one lookup per element: with a single
+    # kind of rule, rule order cannot matter, so no (order, visible) comparisons
+    if not attr_rules and not by_class:
+        if not by_tag:
+            if not by_id:
+                fixed = None if match_all is None else match_all[1]
+                return lambda elem: fixed
+            if match_all is None:
+                visible_by_id = {name: hit[1] for name, hit in by_id.items()}.get
+                return lambda elem: visible_by_id(elem.get("id"))
+        elif not by_id and match_all is None:
+            visible_by_tag = {name: hit[1] for name, hit in by_tag.items()}.get
+            return lambda elem: visible_by_tag(elem.tag.rpartition("}")[2])
+
+    def match(elem):
+        best = match_all
+        if by_id:
+            hit = by_id.get(elem.get("id"))
+            if hit is not None and (best is None or hit[0] > best[0]):
+                best = hit
+        if by_class:
+            classes = elem.get("class")
+            if classes:
+                for cls in classes.split():
+                    hit = by_class.get(cls)
+                    if hit is not None and (best is None or hit[0] > best[0]):
+                        best = hit
+        if by_tag:
+            hit = by_tag.get(elem.tag.rpartition("}")[2])
+            if hit is not None and (best is None or hit[0] > best[0]):
+                best = hit
+        for order, visible, attr_name, attr_value, contains in attr_rules:
+            if best is not None and order < best[0]:
+                break
+            value = elem.get(attr_name)
+            if value is not None and (attr_value in value if contains else value == attr_value):
+                best = (order, visible)
+                break
+        return None if best is None else best[1]
+
+    return match
 
 
 class SVGVisibility:
@@ -58,136 +216,256 @@ class SVGVisibility:
                           visibility_rules_json: str = "[]",
                           default_visible: bool = True,
                           remove_hidden: bool = False):
+        cache_key = ("SVGVisibility", svg_string, visibility_rules_json, default_visible, remove_hidden)
+        cached = cached_result(cache_key)
+        if cached is not None:
+            return cached
+
+        # Parse rules
+        rules = _load_rules(visibility_rules_json)
+
+        if remove_hidden and _LXML:
+            # Decide while parsing and drop hidden subtrees as they complete
+            match = _rule_matcher(rules)
+            try:
+                root, stats = self._stream_remove_hidden(svg_string, match, default_visible)
+            except Exception as e:
+                return (svg_string, json.dumps({"error": f"SVG parse error: {e}"}))
+            output_svg = ET.tostring(root, encoding="unicode")
+            return store_result(cache_key, (output_svg, json.dumps(stats, separators=(",", ":"))))
+
         # Parse SVG
         try:
-            root = ET.fromstring(svg_string)
+            # Parse bytes: lxml rejects str input with an encoding declaration
+            root = ET.fromstring(svg_string.encode("utf-8"), _xml_parser())
         except Exception as e:
             return (svg_string, json.dumps({"error": f"SVG parse error: {e}"}))
 
-        # Parse rules
-        rules: List[Dict[str, Any]] = []
-        try:
-            rules = json.loads(visibility_rules_json)
-            if not isinstance(rules, list):
-                rules = []
-        except Exception:
-            rules = []
+        if not rules and default_visible and not remove_hidden:
+            # Everything stays visible: the only possible edit is dropping display="none",
+            # so skip indexing and, when there is none, re-serializing too
+            shown = 0
+            display_none = []
+            for elem in islice(root.iter("*"), 1, None):
+                shown += 1
+                if elem.get("display") == "none":
+                    display_none.append(elem)
+            stats = {"hidden": 0, "shown": shown, "removed": 0, "display_none": 0}
+            if not display_none:
+                return store_result(cache_key, (svg_string, json.dumps(stats, separators=(",", ":"))))
+            for elem in display_none:
+                del elem.attrib["display"]
+            output_svg = ET.tostring(root, encoding="unicode")
+            return store_result(cache_key, (output_svg, json.dumps(stats, separators=(",", ":"))))
 
         # Build visibility map: element -> visible (bool)
         visibility_map: Dict[ET.Element, bool] = {}
         
-        for rule in rules:
-            selector = str(rule.get("selector", "")).strip()
-            visible = bool(rule.get("visible", True))
-            if not selector:
-                continue
-            
-            # Find matching elements
-            matched = self._find_elements_by_selector(root, selector)
-            for elem in matched:
-                visibility_map[elem] = visible
-
-        stats = {
-            "hidden": 0,
-            "shown": 0,
-            "removed": 0,
-            "display_none": 0
-        }
+        # One walk indexes the tree; each rule is then a lookup, not another walk
+        indices = self._build_indices(root, _rule_attr_names(rules))
+        
+        for selector, visible in rules:
+            # Find matching elements; later rules overwrite earlier ones
+            matched = self._find_elements_by_selector(indices, selector)
+            visibility_map.update(dict.fromkeys(matched, visible))
 
-        # Apply visibility changes
+        # Apply visibility changes (hot loop: bound methods and local counters)
         elements_to_remove = []
+        remove_append = elements_to_remove.append
+        visible_of = visibility_map.get
+        display_none = indices["display_none"]
+        hidden = shown = 0
         
-        for elem in root.iter():
-            # Skip root
-            if elem == root:
-                continue
-            
-            # Determine visibility
-            if elem in visibility_map:
-                visible = visibility_map[elem]
-            else:
-                visible = default_visible
-            
-            if not visible:
-                stats["hidden"] += 1
+        # Reuse the element list recorded by the index walk; it starts with root, which is skipped
+        for elem in islice(indices["elements"], 1, None):
+            if not visible_of(elem, default_visible):
+                hidden += 1
                 if remove_hidden:
                     # Mark for removal (can't remove during iteration)
-                    elements_to_remove.append(elem)
-                    stats["removed"] += 1
-                else:
-                    # Set display:none
-                    elem.set("display", "none")
-                    stats["display_none"] += 1
+                    remove_append(elem)
+                elif elem not in display_none:
+                    # Set display:none (the index knows which already have it)
+                    elem.attrib["display"] = "none"
             else:
-                stats["shown"] += 1
+                shown += 1
                 # Remove display:none if present
-                if elem.get("display") == "none":
+                if elem in display_none:
                     del elem.attrib["display"]
 
-        # Remove hidden elements if requested
+        # Every hidden element is either removed or given display:none
+        stats = {
+            "hidden": hidden,
+            "shown": shown,
+            "removed": hidden if remove_hidden else 0,
+            "display_none": 0 if remove_hidden else hidden
+        }
+
+        # Remove hidden elements if requested (ElementTree only; lxml streams above).
+        # ElementTree has no parent links: prune from the top down instead of
+        # building a full parent map. Descendants leave with a removed subtree.
         if remove_hidden and elements_to_remove:
-            # Find parents and remove children
-            parent_map = {c: p for p in root.iter() for c in p}
-            for elem in elements_to_remove:
-                parent = parent_map.get(elem)
-                if parent is not None:
-                    parent.remove(elem)
-
-        # Convert back to string
+            remove_set = set(elements_to_remove)
+            stack = [root]
+            while stack:
+                parent = stack.pop()
+                kept = [child for child in parent if child not in remove_set]
+                if len(kept) != len(parent):
+                    parent[:] = kept
+                stack.extend(kept)
+
+        # Convert back to string. Under lxml, encoding="unicode" is decoded in C already;
+        # serializing to UTF-8 bytes and decoding in Python measured slower.
         output_svg = ET.tostring(root, encoding="unicode")
         
-        return (output_svg, json.dumps(stats, indent=2))
+        return store_result(cache_key, (output_svg, json.dumps(stats, separators=(",", ":"))))
+
+    def _stream_remove_hidden(self, svg_string: str, match, default_visible: bool):
+        """
+        remove_hidden under lxml: parse with iterparse, decide each element at its start
+        tag and remove hidden subtrees once complete, so they never pile up in memory.
+        Returns (root, stats); raises on parse errors.
+        """
+        context = ET.iterparse(io.BytesIO(svg_string.encode("utf-8")), events=("start", "end"), huge_tree=True)
+        root = None
+        # Per open element: is it hidden, and its last hidden child awaiting removal.
+        # A hidden child is removed only at the next sibling's start or the parent's end,
+        # when its tail text has been parsed (it leaves together with the element).
+        hidden_stack: List[bool] = []
+        pending: List[Optional[ET.Element]] = []
+        hidden = shown = 0
+        for event, elem in context:
+            if event == "start":
+                if root is None:
+                    root = elem  # root itself is never hidden
+                    hidden_stack.append(False)
+                    pending.append(None)
+                    continue
+                done = pending[-1]
+                if done is not None:
+                    done.getparent().remove(done)
+                    pending[-1] = None
+                
+                visible = match(elem)
+                if visible is None:
+                    visible = default_visible
+                if not visible:
+                    hidden += 1
+                else:
+                    shown += 1
+                    # Remove display:none if present
+                    if elem.get("display") == "none":
+                        del elem.attrib["display"]
+                hidden_stack.append(not visible)
+                pending.append(None)
+            else:
+                done = pending.pop()
+                if done is not None:
+                    done.getparent().remove(done)
+                if hidden_stack.pop():
+                    pending[-1] = elem
+        stats = {"hidden": hidden, "shown": shown, "removed": hidden, "display_none": 0}
+        return root, stats
+
+    def _build_indices(self, root: ET.Element, attr_names: Tuple[str, ...] = ()) -> Dict[str, Any]:
+        """
+        Index all elements by id, class, tag and the given attributes in a single
+        walk, and note which already carry display="none". Other attribute indices
+        are filled lazily by the selectors that need them.
+        """
+        elements = []
+        display_none = set()
+        id_index: Dict[str, ET.Element] = {}
+        # Ids are normally unique; only repeated ones need a list
+        id_dups: Dict[str, List[ET.Element]] = {}
+        class_index: Dict[str, List[ET.Element]] = {}
+        tag_index: Dict[str, List[ET.Element]] = {}
+        attr_index: Dict[str, List[Tuple[str, ET.Element]]] = {name: [] for name in attr_names}
+        attr_lists = list(attr_index.items())
+        # "*" yields elements only (lxml keeps comments/PIs in the tree)
+        for elem in root.iter("*"):
+            elements.append(elem)
+            tag_index.setdefault(elem.tag, []).append(elem)
+            elem_id = elem.get("id")
+            if elem_id is not None:
+                first = id_index.setdefault(elem_id, elem)
+                if first is not elem:
+                    id_dups.setdefault(elem_id, [first]).append(elem)
+            classes = elem.get("class")
+            if classes:
+                for cls in set(classes.split()):
+                    class_index.setdefault(cls, []).append(elem)
+            if elem.get("display") == "none":
+                display_none.add(elem)
+            for name, values in attr_lists:
+                value = elem.get(name)
+                if value is not None:
+                    values.append((value, elem))
+        return {"elements": elements, "id": id_index, "id_dups": id_dups, "class": class_index, "tag": tag_index, "local": None,
+                "attr": attr_index, "display_none": display_none}
+
+    def _local_tag_index(self, indices: Dict[str, Any]) -> Dict[str, List[ET.Element]]:
+        """Tag index regrouped by local name; built once, from the distinct tags only"""
+        local_index = indices["local"]
+        if local_index is None:
+            local_index = {}
+            for tag, elems in indices["tag"].items():
+                local_index.setdefault(tag.rpartition("}")[2], []).extend(elems)
+            indices["local"] = local_index
+        return local_index
+
+    def _attr_values(self, indices: Dict[str, Any], attr_name: str) -> List[Tuple[str, ET.Element]]:
+        """(value, element) for every element carrying attr_name; built once per attribute"""
+        attr_index = indices["attr"]
+        values = attr_index.get(attr_name)
+        if values is None:
+            values = []
+            for elem in indices["elements"]:
+                value = elem.get(attr_name)
+                if value is not None:
+                    values.append((value, elem))
+            attr_index[attr_name] = values
+        return values
 
-    def _find_elements_by_selector(self, root: ET.Element, selector: str) -> List[ET.Element]:
+    def _find_elements_by_selector(self, indices: Dict[str, Any], selector: str) -> List[ET.Element]:
         """Find all elements matching a simple selector"""
-        results = []
-        s = selector.strip()
-        
-        # ID selector: #id
-        if s.startswith("#"):
-            target_id = s[1:]
-            for elem in root.iter():
-                if elem.get("id") == target_id:
-                    results.append(elem)
-        
-        # Class selector: .class
-        elif s.startswith("."):
-            target_class = s[1:]
-            for elem in root.iter():
-                classes = (elem.get("class") or "").split()
-                if target_class in classes:
-                    results.append(elem)
-        
-        # Tag selector: g, path, etc.
-        elif s in ["g", "path", "rect", "circle", "ellipse", "line", "polyline", "polygon", "text"]:
-            ns_tag = f"{{http://www.w3.org/2000/svg}}{s}"
-            for elem in root.iter():
-                if elem.tag == ns_tag or elem.tag == s or elem.tag.endswith(f'}}{s}'):
-                    results.append(elem)
-        
-        # Attribute contains selector: [attr*=value]
-        elif s.startswith("[") and s.endswith("]") and "*=" in s:
-            attr_part = s[1:-1]
-            attr_name, attr_value = attr_part.split("*=", 1)
-            attr_name = attr_name.strip()
-            attr_value = attr_value.strip().strip('"').strip("'")
-            for elem in root.iter():
-                elem_value = elem.get(attr_name, "")
-                if attr_value in elem_value:
-                    results.append(elem)
-        
-        # Attribute equals selector: [attr=value]
-        elif s.startswith("[") and s.endswith("]") and "=" in s and "*=" not in s:
-            attr_part = s[1:-1]
-            attr_name, attr_value = attr_part.split("=", 1)
-            attr_name = attr_name.strip()
-            attr_value = attr_value.strip().strip('"').strip("'")
-            for elem in root.iter():
-                if elem.get(attr_name) == attr_value:
-                    results.append(elem)
-        
-        return results
+        parsed = _parse_selector(selector)
+        if parsed is None:
+            return []
+        return self._SELECTORS[parsed[0]](self, indices, parsed)
+
+    # Handlers per selector kind, dispatched by _find_elements_by_selector
+
+    def _select_id(self, indices: Dict[str, Any], parsed: Tuple[str, ...]) -> List[ET.Element]:
+        elem = indices["id"].get(parsed[1])
+        if elem is None:
+            return []
+        return indices["id_dups"].get(parsed[1]) or [elem]
+
+    def _select_class(self, indices: Dict[str, Any], parsed: Tuple[str, ...]) -> List[ET.Element]:
+        return indices["class"].get(parsed[1], [])
+
+    def _select_tag(self, indices: Dict[str, Any], parsed: Tuple[str, ...]) -> List[ET.Element]:
+        # Matches the local name in any namespace
+        return self._local_tag_index(indices).get(parsed[1], [])
+
+    def _select_contains(self, indices: Dict[str, Any], parsed: Tuple[str, ...]) -> List[ET.Element]:
+        attr_name, attr_value = parsed[1], parsed[2]
+        if not attr_value:
+            # Empty needle matches every element, with or without the attribute
+            return indices["elements"]
+        return [elem for value, elem in self._attr_values(indices, attr_name) if attr_value in value]
+
+    def _select_equals(self, indices: Dict[str, Any], parsed: Tuple[str, ...]) -> List[ET.Element]:
+        attr_name, attr_value = parsed[1], parsed[2]
+        return [elem for value, elem in self._attr_values(indices, attr_name) if value == attr_value]
 
+    _SELECTORS = {
+        "id": _select_id,
+        "class": _select_class,
+        "tag": _select_tag,
+        "contains": _select_contains,
+        "equals": _select_equals,
+    }
 
 NODE_CLASS_MAPPINGS = {
     "SVGVisibility": SVGVisibility,